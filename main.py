@@ -10,26 +10,35 @@ NBA Telegram AutoBot (Full)
 - Evita duplicados con SQLite
 - Corre en grupos (no se requiere canal)
 """
-import os, time, sqlite3, logging, io, re, html
+import os, time, sqlite3, logging, io, re, html, threading, functools, hashlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Tuple
+from typing import Optional, Tuple
 
 import feedparser
 import requests
-from apscheduler.schedulers.background import BackgroundScheduler
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from dateutil import tz
 from dateutil.parser import isoparse
+import PIL
 from PIL import Image, ImageDraw, ImageFont
 
 from telegram import Bot, ParseMode
-from telegram.error import TelegramError
+from telegram.error import BadRequest, TelegramError
+from telegram.utils.request import Request
 from dotenv import load_dotenv
 from pathlib import Path
 
 # Extras
-from bs4 import BeautifulSoup
 from deep_translator import GoogleTranslator
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # ----------------- Carga .env -----------------
 ENV_PATH = Path('.env')
@@ -40,6 +49,8 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
 TELEGRAM_CHANNEL_ID = os.getenv("TELEGRAM_CHANNEL_ID", "").strip()
 RSS_FEEDS = [u.strip() for u in os.getenv("RSS_FEEDS", "").split(",") if u.strip()]
 CHECK_EVERY_MINUTES = int(os.getenv("CHECK_EVERY_MINUTES", "20"))
+FEED_WORKERS = int(os.getenv("FEED_WORKERS", "6"))
+POST_MIN_INTERVAL_SECONDS = float(os.getenv("POST_MIN_INTERVAL_SECONDS", "2"))
 TIMEZONE = os.getenv("TIMEZONE", "America/Argentina/Buenos_Aires")
 
 CTA_CRONS = [c.strip() for c in os.getenv("CTA_CRONS", "0 11 * * *; 0 16 * * *; 30 21 * * *").split(";") if c.strip()]
@@ -50,9 +61,12 @@ CTA_MESSAGE = os.getenv("CTA_MESSAGE", "").strip() or (
     "💸 Pago único de $26.700 por toda la temporada\\n\\n"
     "📩 Escribime por privado para que te cree tu cuenta en el momento @nbapass_latam."
 )
+# Convierte '\n' y '\t' literales del .env a saltos reales (una sola vez)
+CTA_MESSAGE_NORMALIZED = CTA_MESSAGE.replace("\\n", "\n").replace("\\t", "\t").strip()
 SCHEDULE_DAILY_CRON = os.getenv("SCHEDULE_DAILY_CRON", "0 10 * * *")
 SCHEDULE_HEADER = os.getenv("SCHEDULE_HEADER", "🗓️ Partidos NBA de hoy")
 ESPN_SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+SCOREBOARD_TTL_SECONDS = int(os.getenv("SCOREBOARD_TTL_SECONDS", "300"))
 
 # ----------------- Validaciones -----------------
 if not TELEGRAM_BOT_TOKEN:
@@ -66,14 +80,36 @@ if not RSS_FEEDS:
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 log = logging.getLogger("nba_telebot")
 
+# ----------------- HTTP -----------------
+# Sesión compartida: reutiliza conexiones TCP/TLS (keep-alive) entre requests
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, deflate"})
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                       max_retries=Retry(total=2, backoff_factor=0.3))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
 # ----------------- DB -----------------
 DB_PATH = "data/state.db"
 os.makedirs("data", exist_ok=True)
 
+def _connect() -> sqlite3.Connection:
+    """Conexión con WAL + synchronous=NORMAL: un commit es un append al WAL, no dos fsync."""
+    con = sqlite3.connect(DB_PATH, check_same_thread=False)
+    con.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA mmap_size=134217728;"
+    )
+    return con
+
+# Una sola conexión para todo el proceso (los jobs del scheduler corren en otros threads)
+db_con = _connect()
+
 def db_init():
-    with sqlite3.connect(DB_PATH) as con:
-        cur = con.cursor()
-        cur.execute("""
+    with db_con:
+        db_con.execute("""
         CREATE TABLE IF NOT EXISTS posts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             feed TEXT NOT NULL,
@@ -83,67 +119,191 @@ def db_init():
             published_at TEXT,
             posted_at TEXT
         )""")
-        con.commit()
-
-def was_posted(guid: str) -> bool:
-    with sqlite3.connect(DB_PATH) as con:
-        cur = con.cursor()
-        cur.execute("SELECT 1 FROM posts WHERE guid = ?", (guid,))
-        return cur.fetchone() is not None
-
-def mark_posted(feed: str, guid: str, title: str, url: str, published_at: str):
-    with sqlite3.connect(DB_PATH) as con:
-        cur = con.cursor()
-        cur.execute("""
+        db_con.execute("""
+        CREATE TABLE IF NOT EXISTS feed_cache (
+            feed TEXT PRIMARY KEY,
+            etag TEXT,
+            modified TEXT
+        )""")
+
+SQLITE_MAX_PARAMS = 500
+
+def posted_guids(guids) -> set:
+    """Devuelve cuáles de los guids ya están en la DB (una consulta por bloque de 500)."""
+    guids = list(guids)
+    found = set()
+    for i in range(0, len(guids), SQLITE_MAX_PARAMS):
+        chunk = guids[i:i + SQLITE_MAX_PARAMS]
+        cur = db_con.execute(f"SELECT guid FROM posts WHERE guid IN ({','.join('?' * len(chunk))})", chunk)
+        found.update(row[0] for row in cur)
+    return found
+
+def mark_posted_many(rows):
+    """Inserta en una sola transacción filas (feed, guid, title, url, published_at, posted_at)."""
+    if not rows:
+        return
+    with db_con:
+        db_con.executemany("""
         INSERT OR IGNORE INTO posts (feed, guid, title, url, published_at, posted_at)
         VALUES (?, ?, ?, ?, ?, ?)
-        """, (feed, guid, title, url, published_at, datetime.utcnow().isoformat()))
-        con.commit()
+        """, rows)
+
+def load_feed_cache() -> dict:
+    """feed -> (etag, modified) de la última respuesta 200 de cada feed."""
+    return {feed: (etag, modified) for feed, etag, modified in db_con.execute(
+        "SELECT feed, etag, modified FROM feed_cache")}
 
-# ----------------- Helpers de texto -----------------
-def normalize_message(s: str) -> str:
-    """Convierte '\n' y '\t' literales del .env a saltos reales y limpia espacios."""
-    return s.replace("\\n", "\n").replace("\\t", "\t").strip()
+def save_feed_cache(rows):
+    """Guarda filas (feed, etag, modified) en una sola transacción."""
+    if not rows:
+        return
+    with db_con:
+        db_con.executemany(
+            "INSERT OR REPLACE INTO feed_cache (feed, etag, modified) VALUES (?, ?, ?)", rows)
 
 # ----------------- Imagen/Media utils -----------------
 ASSETS_DIR = "assets"
 os.makedirs(ASSETS_DIR, exist_ok=True)
 NEWS_PLACEHOLDER = os.path.join(ASSETS_DIR, "news_placeholder.png")
+_PLACEHOLDER_BYTES = Path(NEWS_PLACEHOLDER).read_bytes() if Path(NEWS_PLACEHOLDER).exists() else b""
 
 def download_image_to_bytes(url: str, timeout: int = 15) -> bytes:
     try:
-        r = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        r = SESSION.get(url, timeout=timeout)
         r.raise_for_status()
         return r.content
     except Exception as e:
         log.warning(f"No pude descargar imagen: {url} -> {e}")
         return b""
 
+OG_SCAN_MAX_BYTES = 64 * 1024
+_META_TAG_RE = re.compile(rb"<meta\b[^>]*>", re.I)
+_ATTR_RE = re.compile(rb"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+def _find_og_image(head: bytes) -> str:
+    for tag in _META_TAG_RE.findall(head):
+        attrs = {m.group(1).lower(): next(v for v in m.group(2, 3, 4) if v is not None)
+                 for m in _ATTR_RE.finditer(tag)}
+        if b"og:image" in (attrs.get(b"property"), attrs.get(b"name")) and attrs.get(b"content"):
+            return html.unescape(attrs[b"content"].decode("utf-8", "replace")).strip()
+    return ""
+
 def fetch_opengraph_image(article_url: str, timeout: int = 15) -> str:
-    """Intenta obtener la imagen del artículo leyendo <meta property='og:image'>."""
+    """Intenta obtener la imagen del artículo leyendo <meta property='og:image'>.
+    Solo lee el <head> (hasta OG_SCAN_MAX_BYTES), sin armar el DOM de la página."""
     try:
-        r = requests.get(article_url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "lxml")
-        tag = soup.find("meta", attrs={"property": "og:image"}) or soup.find("meta", attrs={"name": "og:image"})
-        if tag and tag.get("content"):
-            return tag.get("content").strip()
+        with SESSION.get(article_url, timeout=timeout, stream=True) as r:
+            r.raise_for_status()
+            head = b""
+            for chunk in r.iter_content(8192):
+                head += chunk
+                og = _find_og_image(head)
+                if og:
+                    return og
+                if len(head) >= OG_SCAN_MAX_BYTES or b"</head>" in head or b"</HEAD>" in head:
+                    break
     except Exception as e:
         log.warning(f"OG image fallback failed for {article_url}: {e}")
     return ""
 
 # Traducción
-_translator = GoogleTranslator(source="auto", target="es")
+# GoogleTranslator guarda el texto en estado interno: un traductor por thread del pool
+_translator_local = threading.local()
+
+def _get_translator() -> GoogleTranslator:
+    translator = getattr(_translator_local, "translator", None)
+    if translator is None:
+        translator = _translator_local.translator = GoogleTranslator(source="auto", target="es")
+    return translator
+
+@functools.lru_cache(maxsize=512)
+def _translate_cached(text: str) -> str:
+    return _get_translator().translate(text)
+
 def translate_to_spanish(text: str, limit: int = 0) -> str:
     try:
         t = text if not limit or len(text) <= limit else text[:limit]
-        return _translator.translate(t)
+        return _translate_cached(t)
     except Exception as e:
         log.warning(f"No pude traducir: {e}")
         return text
 
+# ----------------- Logos de equipos (cache) -----------------
+LOGO_SIZE = 110
+LOGO_CACHE_DIR = Path(ASSETS_DIR) / "logo_cache"
+_LOGO_MEM = {}  # (url, size) -> Image RGBA ya redimensionada
+
+def _team_logo_url(t):
+    return t.get("team", {}).get("logo") or (t.get("team", {}).get("logos", [{}])[0].get("href") if t.get("team", {}).get("logos") else None)
+
+def game_logo_urls(games) -> list:
+    return list({url for g in games for url in (g.home_logo, g.away_logo) if url})
+
+def get_logo(url: str, size: int = LOGO_SIZE):
+    """Logo redimensionado: memoria -> assets/logo_cache -> descarga. None si falla."""
+    key = (url, size)
+    im = _LOGO_MEM.get(key)
+    if im is not None:
+        return im
+    path = LOGO_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}_{size}.png"
+    if path.exists():
+        try:
+            im = Image.open(path).convert("RGBA")
+        except Exception as e:
+            # Archivo truncado/corrupto: se borra y se vuelve a bajar
+            log.warning(f"Logo en cache inválido, lo vuelvo a bajar: {path} -> {e}")
+            path.unlink(missing_ok=True)
+    if im is None:
+        try:
+            raw = download_image_to_bytes(url)
+            if not raw:
+                return None
+            im = Image.open(io.BytesIO(raw))
+            im.draft("RGB", (size * 2, size * 2))  # solo JPEG: decodifica ya submuestreado
+            im = im.convert("RGBA")
+            # BILINEAR alcanza a ~110px y es bastante más barato que LANCZOS (default)
+            im.thumbnail((size, size), Image.Resampling.BILINEAR)
+        except Exception as e:
+            log.warning(f"No pude procesar logo: {url} -> {e}")
+            return None
+        # Escritura atómica: temp propio de este thread + os.replace
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            LOGO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            im.save(tmp, format="PNG")
+            os.replace(tmp, path)
+        except Exception as e:
+            log.warning(f"No pude guardar logo en cache: {path} -> {e}")
+            tmp.unlink(missing_ok=True)
+    _LOGO_MEM[key] = im
+    return im
+
+def prewarm_logos():
+    """Precarga los logos del scoreboard de hoy para que la primera placa no espere la red."""
+    try:
+        tz_local = tz.gettz(TIMEZONE)
+        events = get_scoreboard_events(datetime.now(tz_local).strftime("%Y%m%d"))
+        urls = game_logo_urls(parse_events(events, tz_local))
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            loaded = sum(1 for im in ex.map(get_logo, urls) if im is not None)
+        log.info(f"Logos precargados: {loaded}/{len(urls)}")
+    except Exception as e:
+        log.warning(f"No pude precargar logos: {e}")
+
 # ----------------- Placa de “Partidos de hoy” (mejorada) -----------------
-def build_daily_schedule_image(events) -> bytes:
+# Fuentes: usa TTF en assets/fonts si existen; si no, default (se cargan una sola vez)
+FONT_TITLE = FONT_TEAM = FONT_TIME = FONT_SMALL = ImageFont.load_default()
+try:
+    _fdir = Path(ASSETS_DIR) / "fonts"
+    if (_fdir / "Inter-SemiBold.ttf").exists():
+        FONT_TITLE = ImageFont.truetype(str(_fdir / "Inter-SemiBold.ttf"), 56)
+        FONT_TEAM  = ImageFont.truetype(str(_fdir / "Inter-SemiBold.ttf"), 36)
+        FONT_TIME  = ImageFont.truetype(str(_fdir / "Inter-Medium.ttf"), 34)
+        FONT_SMALL = ImageFont.truetype(str(_fdir / "Inter-Regular.ttf"), 24)
+except Exception:
+    pass
+
+def build_daily_schedule_image(games) -> bytes:
     """Genera una imagen 1080x1080 con título, filas alternadas, logos grandes y 'píldora' de hora."""
     W, H = 1080, 1080
     pad, row_h = 48, 150
@@ -152,68 +312,31 @@ def build_daily_schedule_image(events) -> bytes:
     bg = Image.new("RGB", (W, H), (12, 14, 22))
     draw = ImageDraw.Draw(bg)
 
-    # Fuentes: usa TTF en assets/fonts si existen; si no, default
-    font_title = ImageFont.load_default()
-    font_team  = ImageFont.load_default()
-    font_time  = ImageFont.load_default()
-    font_small = ImageFont.load_default()
-    try:
-        from pathlib import Path as _Path
-        fdir = _Path("assets") / "fonts"
-        if (fdir / "Inter-SemiBold.ttf").exists():
-            font_title = ImageFont.truetype(str(fdir / "Inter-SemiBold.ttf"), 56)
-            font_team  = ImageFont.truetype(str(fdir / "Inter-SemiBold.ttf"), 36)
-            font_time  = ImageFont.truetype(str(fdir / "Inter-Medium.ttf"), 34)
-            font_small = ImageFont.truetype(str(fdir / "Inter-Regular.ttf"), 24)
-    except Exception:
-        pass
-
     # Header
     draw.rectangle([(0, 0), (W, title_h)], fill=(20, 22, 34))
     tz_local = tz.gettz(TIMEZONE)
     now_local = datetime.now(tz_local)
     date_str = now_local.strftime("%A %d %b %Y").title()
-    draw.text((pad, 60), "PARTIDOS NBA DE HOY", fill=(245, 246, 255), font=font_title)
-    draw.text((pad, 110), date_str, fill=(180, 184, 205), font=font_small)
+    draw.text((pad, 60), "PARTIDOS NBA DE HOY", fill=(245, 246, 255), font=FONT_TITLE)
+    draw.text((pad, 110), date_str, fill=(180, 184, 205), font=FONT_SMALL)
+
+    # Resuelve todos los logos en paralelo antes de dibujar
+    games = games[:max_rows]
+    logo_urls = game_logo_urls(games)
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        logos = dict(zip(logo_urls, ex.map(get_logo, logo_urls)))
 
     # Helpers
-    def paste_logo(url, x, y_center, size=112):
-        if not url: return
-        raw = download_image_to_bytes(url)
-        if not raw: return
+    def paste_logo(im, x, y_center):
+        if im is None: return
         try:
-            im = Image.open(io.BytesIO(raw)).convert("RGBA")
-            im.thumbnail((size, size))
             bg.paste(im, (x, int(y_center - im.height / 2)), im)
         except Exception:
             pass
 
     # Filas
     y, shown = title_h + 10, 0
-    for ev in events[:max_rows]:
-        comps = ev.get("competitions", [])
-        if not comps: continue
-        comp = comps[0]
-        teams = comp.get("competitors", [])
-        if len(teams) != 2: continue
-
-        home = next((t for t in teams if t.get("homeAway") == "home"), teams[0])
-        away = next((t for t in teams if t.get("homeAway") == "away"), teams[-1])
-
-        home_name = home.get("team", {}).get("shortDisplayName") or home.get("team", {}).get("displayName", "Local")
-        away_name = away.get("team", {}).get("shortDisplayName") or away.get("team", {}).get("displayName", "Visita")
-
-        def _logo(t):
-            return t.get("team", {}).get("logo") or (t.get("team", {}).get("logos", [{}])[0].get("href") if t.get("team", {}).get("logos") else None)
-
-        home_logo, away_logo = _logo(home), _logo(away)
-
-        try:
-            tip_local = isoparse(ev.get("date")).astimezone(tz.gettz(TIMEZONE))
-            hour_str = tip_local.strftime("%H:%M")
-        except Exception:
-            hour_str = "--:--"
-
+    for g in games:
         top = y + shown * row_h
         bottom = top + row_h - 12
         fill_row = (24, 26, 38) if shown % 2 == 0 else (18, 20, 30)
@@ -221,11 +344,11 @@ def build_daily_schedule_image(events) -> bytes:
 
         center_y = (top + bottom) // 2
 
-        paste_logo(away_logo, pad + 20, center_y, size=110)
-        paste_logo(home_logo, W - pad - 20 - 110, center_y, size=110)
+        paste_logo(logos.get(g.away_logo), pad + 20, center_y)
+        paste_logo(logos.get(g.home_logo), W - pad - 20 - LOGO_SIZE, center_y)
 
-        draw.text((pad + 150, center_y - 24), f"{away_name}  @  {home_name}",
-                  fill=(235, 238, 250), font=font_team)
+        draw.text((pad + 150, center_y - 24), f"{g.away_name}  @  {g.home_name}",
+                  fill=(235, 238, 250), font=FONT_TEAM)
 
         # Píldora de hora
         pill_w, pill_h = 150, 44
@@ -233,17 +356,19 @@ def build_daily_schedule_image(events) -> bytes:
         pill_y1 = center_y - pill_h // 2
         draw.rounded_rectangle([(pill_x1, pill_y1), (pill_x1 + pill_w, pill_y1 + pill_h)],
                                radius=22, fill=(39, 161, 79))
-        tw, th = draw.textbbox((0, 0), hour_str, font=font_time)[2:]
+        hour_str = g.hour_str or "--:--"
+        tw, th = draw.textbbox((0, 0), hour_str, font=FONT_TIME)[2:]
         draw.text((pill_x1 + (pill_w - tw) / 2, pill_y1 + (pill_h - th) / 2),
-                  hour_str, fill=(255, 255, 255), font=font_time)
+                  hour_str, fill=(255, 255, 255), font=FONT_TIME)
 
         shown += 1
 
     draw.text((pad, H - footer_h + 20), "Fuente: ESPN Scoreboard",
-              fill=(170, 174, 196), font=font_small)
+              fill=(170, 174, 196), font=FONT_SMALL)
 
     buf = io.BytesIO()
-    bg.save(buf, format="PNG")
+    # JPEG: mucho más chico y rápido de codificar que PNG para una placa 1080x1080
+    bg.save(buf, format="JPEG", quality=85, optimize=True, progressive=True)
     return buf.getvalue()
 
 # ----------------- RSS helpers -----------------
@@ -268,6 +393,9 @@ POST_TEMPLATE = os.getenv("POST_TEMPLATE", "").strip() or (
     "📰 {title}\n\n{excerpt}\n\n🔗 {link}\n🕒 {published}\nFuente: {source}"
 )
 
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
 def extract_excerpt(entry, max_chars: int = 350) -> str:
     raw = ""
     try:
@@ -280,9 +408,9 @@ def extract_excerpt(entry, max_chars: int = 350) -> str:
     except Exception:
         raw = entry.get("summary") or entry.get("description") or ""
 
-    text = re.sub(r"<[^>]+>", " ", raw)
+    text = _TAG_RE.sub(" ", raw)
     text = html.unescape(text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
 
     if len(text) > max_chars:
         cut = text[:max_chars]
@@ -290,8 +418,13 @@ def extract_excerpt(entry, max_chars: int = 350) -> str:
         text = cut + "…"
     return text
 
-def format_entry(feed_name: str, entry) -> Tuple[str, str]:
-    title = entry.get("title", "(Sin título)")
+def translate_entry(entry) -> Tuple[str, str]:
+    """Devuelve (título, resumen) traducidos; corre en el pool junto con las imágenes."""
+    title_es = translate_to_spanish(entry.get("title", "(Sin título)"), limit=200)
+    excerpt_es = translate_to_spanish(extract_excerpt(entry), limit=1000)
+    return title_es, excerpt_es
+
+def format_entry(feed_name: str, entry, title_es: str, excerpt_es: str) -> Tuple[str, str]:
     link = entry.get("link", "")
     published = entry.get("published", "") or entry.get("updated", "")
     try:
@@ -300,18 +433,36 @@ def format_entry(feed_name: str, entry) -> Tuple[str, str]:
             published = dt.strftime("%d %b %Y %H:%M")
     except Exception:
         pass
-    excerpt = extract_excerpt(entry)
-
-    title_es = translate_to_spanish(title, limit=200)
-    excerpt_es = translate_to_spanish(excerpt, limit=1000)
 
     text = POST_TEMPLATE.format(title=title_es, excerpt=excerpt_es, link=link, published=published, source=feed_name)
     return text, link
 
 # ----------------- Telegram -----------------
-bot = Bot(token=TELEGRAM_BOT_TOKEN)
+# Pool más grande que el default (1): feeds y CTAs pueden publicar desde threads distintos
+bot = Bot(token=TELEGRAM_BOT_TOKEN,
+          request=Request(con_pool_size=16, connect_timeout=10, read_timeout=30))
+
+_post_lock = threading.Lock()
+_last_post_at = 0.0
+
+def _throttle_post():
+    """Respeta POST_MIN_INTERVAL_SECONDS entre publicaciones; solo espera lo que falta."""
+    global _last_post_at
+    with _post_lock:
+        wait = _last_post_at + POST_MIN_INTERVAL_SECONDS - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_post_at = time.monotonic()
+
+# BadRequest que indican que Telegram no pudo descargar la imagen (no errores del caption)
+_URL_FETCH_ERRORS = (
+    "wrong file identifier/http url",
+    "failed to get http url content",
+    "wrong type of the web page content",
+)
 
 def post_to_channel(text: str, image_url: str = "", image_bytes: bytes = b""):
+    _throttle_post()
     try:
         if image_bytes:
             bot.send_photo(chat_id=TELEGRAM_CHANNEL_ID, photo=image_bytes, caption=text, parse_mode=ParseMode.HTML)
@@ -319,104 +470,193 @@ def post_to_channel(text: str, image_url: str = "", image_bytes: bytes = b""):
             bot.send_photo(chat_id=TELEGRAM_CHANNEL_ID, photo=image_url, caption=text, parse_mode=ParseMode.HTML)
         else:
             bot.send_message(chat_id=TELEGRAM_CHANNEL_ID, text=text, parse_mode=ParseMode.HTML, disable_web_page_preview=False)
+    except BadRequest as e:
+        if image_url and not image_bytes and any(m in str(e).lower() for m in _URL_FETCH_ERRORS):
+            # Telegram no pudo bajar la URL: recién ahí subimos bytes (la imagen o el placeholder)
+            log.warning(f"Telegram rechazó la imagen {image_url}: {e}")
+            return post_to_channel(text, image_bytes=download_image_to_bytes(image_url) or _PLACEHOLDER_BYTES)
+        log.error(f"Error al publicar en Telegram: {e}")
     except TelegramError as e:
         log.error(f"Error al publicar en Telegram: {e}")
 
 # ----------------- Lógica principal -----------------
-def check_feeds():
-    for feed_url in RSS_FEEDS:
-        try:
-            fp = feedparser.parse(feed_url)
-            feed_name = fp.feed.get("title", feed_url)
-            for entry in fp.entries[:8]:
-                guid = entry.get("id") or entry.get("guid") or entry.get("link")
-                if not guid or was_posted(guid):
-                    continue
-                text, link = format_entry(feed_name, entry)
-                img_url = get_feed_entry_image_url(entry)
-                if img_url:
-                    post_to_channel(text, image_url=img_url)
-                else:
-                    try:
-                        with open(NEWS_PLACEHOLDER, "rb") as ph:
-                            post_to_channel(text, image_bytes=ph.read())
-                    except Exception:
-                        post_to_channel(text)
-                mark_posted(feed_url, guid, entry.get("title",""), link, entry.get("published",""))
-                time.sleep(2)
-        except Exception as e:
-            log.exception(f"Error procesando feed {feed_url}: {e}")
+def _fetch_feed(feed_url: str, etag: str = None, modified: str = None):
+    """Descarga y parsea un feed con GET condicional (corre en el pool de threads)."""
+    try:
+        return feed_url, feedparser.parse(feed_url, etag=etag, modified=modified)
+    except Exception as e:
+        log.warning(f"No pude leer el feed {feed_url}: {e}")
+        return feed_url, None
 
-def fetch_todays_games_message() -> str:
+# Prefetch por entrada: un error solo afecta a esa entrada, no al ciclo completo
+def _prefetch_image_url(entry) -> str:
     try:
-        tz_local = tz.gettz(TIMEZONE)
-        now_local = datetime.now(tz_local)
-        dates_param = now_local.strftime("%Y%m%d")
-        resp = requests.get(ESPN_SCOREBOARD_URL, params={"dates": dates_param}, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
-        events = data.get("events", [])
-        if not events:
-            return f"{SCHEDULE_HEADER}\n\nNo hay partidos programados hoy."
-        lines = [SCHEDULE_HEADER, ""]
-        for ev in events:
-            comps = ev.get("competitions", [])
-            if not comps:
-                continue
-            comp = comps[0]
-            teams = comp.get("competitors", [])
-            if len(teams) != 2:
-                continue
-            home = next((t for t in teams if t.get("homeAway") == "home"), teams[0])
-            away = next((t for t in teams if t.get("homeAway") == "away"), teams[-1])
-            home_name = home.get("team", {}).get("shortDisplayName") or home.get("team", {}).get("displayName")
-            away_name = away.get("team", {}).get("shortDisplayName") or away.get("team", {}).get("displayName")
-            date_iso = ev.get("date")
-            tip_local = None
-            if date_iso:
+        return get_feed_entry_image_url(entry)
+    except Exception as e:
+        log.warning(f"No pude obtener imagen de {entry.get('link', '')}: {e}")
+        return ""
+
+def _prefetch_translation(entry) -> Tuple[str, str]:
+    try:
+        return translate_entry(entry)
+    except Exception as e:
+        log.warning(f"No pude preparar el texto de {entry.get('link', '')}: {e}")
+        return entry.get("title", "(Sin título)"), ""
+
+def check_feeds():
+    # Nunca levanta: un error de DB/red se loguea y se reintenta en el próximo intervalo
+    try:
+        feed_cache = load_feed_cache()
+        cache_rows, failed_feeds = {}, set()
+        # Red en paralelo (feeds + imágenes); DB y Telegram quedan en serie
+        with ThreadPoolExecutor(max_workers=FEED_WORKERS) as ex:
+            candidates, seen = [], set()
+            futures = [ex.submit(_fetch_feed, url, *feed_cache.get(url, (None, None))) for url in RSS_FEEDS]
+            for fut in futures:
+                feed_url, fp = fut.result()
+                if fp is None or fp.get("status") == 304:
+                    continue
+                if fp.get("etag") or fp.get("modified"):
+                    cache_rows[feed_url] = (feed_url, fp.get("etag"), fp.get("modified"))
+                feed_name = fp.feed.get("title", feed_url)
+                for entry in fp.entries[:8]:
+                    guid = entry.get("id") or entry.get("guid") or entry.get("link")
+                    if not guid or guid in seen:
+                        continue
+                    seen.add(guid)
+                    candidates.append((feed_url, feed_name, guid, entry))
+            posted_set = posted_guids(seen)
+            pending = [c for c in candidates if c[2] not in posted_set]
+            img_urls = ex.map(lambda p: _prefetch_image_url(p[3]), pending)
+            translations = ex.map(lambda p: _prefetch_translation(p[3]), pending)
+            prefetched = list(zip(pending, img_urls, translations))
+
+        posted_rows = []
+        try:
+            for (feed_url, feed_name, guid, entry), img_url, (title_es, excerpt_es) in prefetched:
                 try:
-                    tip_local = isoparse(date_iso).astimezone(tz_local)
-                except Exception:
-                    tip_local = None
-            hour_str = tip_local.strftime("%H:%M") if tip_local else "Horario a confirmar"
-            status = comp.get("status", {}).get("type", {}).get("state", "").lower()
-            status_map = {"pre": "Programado", "in": "EN VIVO", "post": "Finalizado"}
-            status_txt = status_map.get(status, "").strip()
-            line = f"• {away_name} @ {home_name} — {hour_str}" + (f" ({status_txt})" if status_txt else "")
-            lines.append(line)
-        return "\n".join(lines)
-    except Exception:
+                    text, link = format_entry(feed_name, entry, title_es, excerpt_es)
+                    if img_url:
+                        post_to_channel(text, image_url=img_url)
+                    else:
+                        post_to_channel(text, image_bytes=_PLACEHOLDER_BYTES)
+                    posted_rows.append((feed_url, guid, entry.get("title",""), link,
+                                        entry.get("published",""), datetime.utcnow().isoformat()))
+                except Exception as e:
+                    failed_feeds.add(feed_url)
+                    log.exception(f"Error procesando entrada {guid} de {feed_url}: {e}")
+        finally:
+            mark_posted_many(posted_rows)
+            # Si una entrada falló, no guardamos el ETag: el próximo ciclo vuelve a bajar el feed
+            save_feed_cache([row for url, row in cache_rows.items() if url not in failed_feeds])
+    except Exception as e:
+        log.exception(f"Error en el ciclo de feeds: {e}")
+
+_scoreboard_cache = {}  # dates_param -> (timestamp, events)
+
+def get_scoreboard_events(dates_param: str) -> list:
+    """Eventos del scoreboard de ESPN para la fecha YYYYMMDD, cacheados SCOREBOARD_TTL_SECONDS."""
+    hit = _scoreboard_cache.get(dates_param)
+    if hit and time.monotonic() - hit[0] < SCOREBOARD_TTL_SECONDS:
+        return hit[1]
+    resp = SESSION.get(ESPN_SCOREBOARD_URL, params={"dates": dates_param}, timeout=20)
+    resp.raise_for_status()
+    events = json_loads(resp.content).get("events", [])
+    # Solo guardamos la fecha pedida: las de días anteriores no se vuelven a usar
+    _scoreboard_cache.clear()
+    _scoreboard_cache[dates_param] = (time.monotonic(), events)
+    return events
+
+Game = namedtuple("Game", "home_name away_name home_logo away_logo hour_str status_txt")
+_STATUS_MAP = {"pre": "Programado", "in": "EN VIVO", "post": "Finalizado"}
+
+def parse_events(events, tz_local) -> list:
+    """Una sola pasada sobre el JSON de ESPN -> lista de Game (hour_str vacío si no hay horario)."""
+    games = []
+    for ev in events:
+        comps = ev.get("competitions", [])
+        if not comps:
+            continue
+        comp = comps[0]
+        teams = comp.get("competitors", [])
+        if len(teams) != 2:
+            continue
+        home = next((t for t in teams if t.get("homeAway") == "home"), teams[0])
+        away = next((t for t in teams if t.get("homeAway") == "away"), teams[-1])
+        home_team, away_team = home.get("team", {}), away.get("team", {})
+        hour_str = ""
+        date_iso = ev.get("date")
+        if date_iso:
+            try:
+                hour_str = isoparse(date_iso).astimezone(tz_local).strftime("%H:%M")
+            except Exception:
+                pass
+        status = comp.get("status", {}).get("type", {}).get("state", "").lower()
+        games.append(Game(
+            home_name=home_team.get("shortDisplayName") or home_team.get("displayName", "Local"),
+            away_name=away_team.get("shortDisplayName") or away_team.get("displayName", "Visita"),
+            home_logo=_team_logo_url(home),
+            away_logo=_team_logo_url(away),
+            hour_str=hour_str,
+            status_txt=_STATUS_MAP.get(status, ""),
+        ))
+    return games
+
+def _fetch_events(tz_local) -> Optional[list]:
+    """Eventos de hoy en ESPN (via cache); None si no se pudieron obtener."""
+    try:
+        return get_scoreboard_events(datetime.now(tz_local).strftime("%Y%m%d"))
+    except Exception as e:
+        log.warning(f"No pude obtener el scoreboard de ESPN: {e}")
+        return None
+
+def format_schedule_text(games) -> str:
+    """Texto del calendario; games=None indica que falló la descarga."""
+    if games is None:
         return f"{SCHEDULE_HEADER}\n\nNo pude obtener los partidos de hoy."
+    if not games:
+        return f"{SCHEDULE_HEADER}\n\nNo hay partidos programados hoy."
+    lines = [SCHEDULE_HEADER, ""]
+    for g in games:
+        line = f"• {g.away_name} @ {g.home_name} — {g.hour_str or 'Horario a confirmar'}" + (f" ({g.status_txt})" if g.status_txt else "")
+        lines.append(line)
+    return "\n".join(lines)
 
 def post_cta():
-    msg = normalize_message(CTA_MESSAGE)  # arregla \n del .env
+    msg = CTA_MESSAGE_NORMALIZED
+    # Una sola descarga/parseo del scoreboard para el texto y la imagen
+    tz_local = tz.gettz(TIMEZONE)
+    events = _fetch_events(tz_local)
+    games = None
+    if events is not None:
+        try:
+            games = parse_events(events, tz_local)
+        except Exception as e:
+            # Payload con forma inesperada: el CTA sale igual, sin calendario
+            log.warning(f"No pude interpretar el scoreboard de ESPN: {e}")
     if CTA_INCLUDE_SCHEDULE:
-        sched_text = fetch_todays_games_message()
-        msg = f"{msg}\n\n{sched_text}"
+        msg = f"{msg}\n\n{format_schedule_text(games)}"
     # Intentar con imagen del calendario
-    try:
-        tz_local = tz.gettz(TIMEZONE)
-        now_local = datetime.now(tz_local)
-        dates_param = now_local.strftime("%Y%m%d")
-        resp = requests.get(ESPN_SCOREBOARD_URL, params={"dates": dates_param}, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
-        events = data.get("events", [])
-        if events:
-            img_bytes = build_daily_schedule_image(events)
+    if games:
+        try:
+            img_bytes = build_daily_schedule_image(games)
             post_to_channel(msg, image_bytes=img_bytes)
             return
-    except Exception as e:
-        log.warning(f"No pude generar imagen del calendario: {e}")
+        except Exception as e:
+            log.warning(f"No pude generar imagen del calendario: {e}")
     post_to_channel(msg)
 
 def main():
     db_init()
     log.info("Iniciando NBA Telegram AutoBot 🤖🏀")
+    # Pillow-SIMD publica versiones "X.Y.Z.postN" (ver README_QUICKSTART.txt)
+    if ".post" not in PIL.__version__:
+        log.info(f"Pillow {PIL.__version__} sin SIMD: la placa se genera más lento (opcional: pillow-simd)")
+    prewarm_logos()
     # Primer barrido al inicio
     check_feeds()
 
-    scheduler = BackgroundScheduler(timezone=TIMEZONE)
+    scheduler = BlockingScheduler(timezone=TIMEZONE)
     scheduler.add_job(check_feeds, 'interval', minutes=CHECK_EVERY_MINUTES, id="feeds")
 
     # CTAs 3x/día
@@ -434,13 +674,13 @@ def main():
     except Exception as e:
         log.error(f"No pude agregar el cron de 'partidos de hoy': {e}")
 
-    scheduler.start()
+    # Bloquea el thread principal hasta Ctrl+C / SystemExit
     try:
-        while True:
-            time.sleep(60)
-    except KeyboardInterrupt:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
         log.info("Cerrando bot...")
-        scheduler.shutdown()
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
 
 if __name__ == "__main__":
     main()